@@ -0,0 +1,378 @@
+import asyncio
+import json
+import re
+import itertools
+from collections import OrderedDict
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from app.core.downloader import VideoAnalyzer, VideoDownloader
+from app.core.history import HistoryManager, PagedHistoryManager
+from app.core.search import parse_query
+
+TERMINAL_STATUSES = ('Finished', 'Paused', 'Cancelled', 'Error')
+
+STOP_MESSAGES = {'Paused': "Download Paused.", 'Cancelled': "Download Cancelled."}
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 409: 'Conflict', 500: 'Internal Server Error'}
+
+ANALYSIS_CACHE_SIZE = 100 # Recent /analyze results kept so /jobs can reuse their format list
+JOB_RETENTION = 200 # Finished jobs kept for GET /jobs before the oldest are dropped
+MAX_HISTORY_PAGE = 500 # Largest limit accepted by GET /history
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Job:
+    """
+    One submitted download. Progress is broadcast by swapping an asyncio.Event:
+    every subscriber waits on the same event and then reads the latest state, so
+    a slow subscriber skips intermediate updates instead of queueing them and
+    each one costs a single waiter, whatever the update rate.
+    """
+    def __init__(self, job_id, url, format_data, downloader):
+        self.id = job_id
+        self.downloader = downloader
+        self.state = {
+            'id': job_id,
+            'url': url,
+            'format': format_data['id'],
+            'status': 'Queued',
+            'message': 'Queued',
+            'progress': 0.0,
+        }
+        self.version = 0
+        self._changed = asyncio.Event()
+        self.future = None # concurrent.futures.Future of the download
+
+    @property
+    def done(self):
+        return self.state['status'] in TERMINAL_STATUSES
+
+    def publish(self, **changes):
+        # Event-loop thread only; worker threads go through call_soon_threadsafe.
+        self.state.update(changes)
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, version):
+        while self.version == version:
+            await self._changed.wait()
+
+class ApiServer:
+    """
+    Local HTTP/JSON API over VideoAnalyzer and VideoDownloader.
+
+        POST /analyze               {"url": ...}
+        POST /jobs                  {"url": ..., "format": "video-720", "title": ..., "output_path": ...}
+        GET  /jobs
+        GET  /jobs/<id>
+        GET  /jobs/<id>/events      Server-Sent Events stream of progress
+        POST /jobs/<id>/pause
+        POST /jobs/<id>/cancel
+        GET  /history?q=lofi&status=Error&host=youtube.com&format=720p&after=2024-01-01&before=2024-12-31&offset=0&limit=50
+
+    analyzer and downloader_factory can be swapped out to run without network access.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, low_memory=False, analyzer=None,
+                 downloader_factory=None, history_manager=None, max_downloads=3, job_retention=JOB_RETENTION):
+        self.host = host
+        self.port = port
+        self.analyzer = analyzer or VideoAnalyzer(low_memory=low_memory)
+        self.history_manager = history_manager or (PagedHistoryManager() if low_memory else HistoryManager())
+        self.downloader_factory = downloader_factory or VideoDownloader
+        self.jobs = {}
+        self.job_retention = job_retention
+        self._job_ids = itertools.count(1)
+        self._analyses = OrderedDict() # url -> {'title', 'formats'}
+        self._executor = ThreadPoolExecutor(max_workers=max_downloads, thread_name_prefix="download")
+        self._server = None
+        self._loop = None
+        self.routes = [
+            ('POST', re.compile(r'/analyze'), self.handle_analyze),
+            ('POST', re.compile(r'/jobs'), self.handle_submit),
+            ('GET', re.compile(r'/jobs'), self.handle_list_jobs),
+            ('GET', re.compile(r'/jobs/(\d+)'), self.handle_get_job),
+            ('GET', re.compile(r'/jobs/(\d+)/events'), self.handle_events),
+            ('POST', re.compile(r'/jobs/(\d+)/pause'), self.handle_pause),
+            ('POST', re.compile(r'/jobs/(\d+)/cancel'), self.handle_cancel),
+            ('GET', re.compile(r'/history'), self.handle_history),
+        ]
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 picks a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for job in self.jobs.values():
+            job.downloader.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        if not self._server:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # --- HTTP plumbing ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            method, path, query, body = await self._read_request(reader)
+            handler, args = self._route(method, path)
+            result = await handler(writer, query, body, *args)
+            if result is not None:
+                status, payload = result
+                await self._send_json(writer, status, payload)
+        except HttpError as e:
+            await self._send_json(writer, e.status, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # Client went away
+        except Exception as e:
+            await self._send_json(writer, 500, {'error': str(e)})
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        body = None
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length")
+        if length:
+            raw = await reader.readexactly(length)
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                raise HttpError(400, "Body must be JSON")
+
+        parts = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        return method.upper(), parts.path.rstrip('/') or '/', query, body
+
+    def _route(self, method, path):
+        for route_method, pattern, handler in self.routes:
+            m = pattern.fullmatch(path)
+            if m and route_method == method:
+                return handler, m.groups()
+        raise HttpError(404, f"No route for {method} {path}")
+
+    async def _send_json(self, writer, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _get_job(self, job_id):
+        job = self.jobs.get(int(job_id))
+        if not job:
+            raise HttpError(404, f"No job {job_id}")
+        return job
+
+    def _require(self, body, key):
+        if not isinstance(body, dict) or not body.get(key):
+            raise HttpError(400, f"Missing '{key}'")
+        if not isinstance(body[key], str):
+            raise HttpError(400, f"'{key}' must be a string")
+        return body[key]
+
+    def _optional(self, body, key, default):
+        value = body.get(key)
+        if value is None or value == '':
+            return default
+        if not isinstance(value, str):
+            raise HttpError(400, f"'{key}' must be a string")
+        return value
+
+    async def _analyze(self, url):
+        data = await self._loop.run_in_executor(None, self.analyzer.extract_info, url)
+        if 'error' not in data:
+            self._analyses[url] = {'title': data.get('title'), 'formats': data.get('formats', [])}
+            self._analyses.move_to_end(url)
+            while len(self._analyses) > ANALYSIS_CACHE_SIZE:
+                self._analyses.popitem(last=False)
+        return data
+
+    def _publish_threadsafe(self, job, **changes):
+        # For worker threads: hop back onto the loop to publish
+        try:
+            self._loop.call_soon_threadsafe(partial(job.publish, **changes))
+        except RuntimeError:
+            pass # Loop already closed during shutdown
+
+    def _prune_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.job_retention)]:
+            del self.jobs[job_id]
+
+    # --- Handlers ---
+
+    async def handle_analyze(self, writer, query, body):
+        url = self._require(body, 'url')
+        data = await self._analyze(url)
+        return (400 if 'error' in data else 200), data
+
+    async def handle_submit(self, writer, query, body):
+        url = self._require(body, 'url')
+        format_id = self._require(body, 'format')
+        output_path = self._optional(body, 'output_path', "downloads")
+        title = self._optional(body, 'title', None)
+
+        # Use the analyzer's own format dicts (labels included) exactly as the window does
+        analysis = self._analyses.get(url) or await self._analyze(url)
+        if 'error' in analysis:
+            raise HttpError(400, analysis['error'])
+        format_data = next((f for f in analysis['formats'] if f['id'] == format_id), None)
+        if not format_data:
+            available = ', '.join(f['id'] for f in analysis['formats'])
+            raise HttpError(400, f"Unknown format id: {format_id} (available: {available})")
+
+        self._prune_jobs()
+        job_id = next(self._job_ids)
+        downloader = self.downloader_factory(history_manager=self.history_manager)
+        job = Job(job_id, url, format_data, downloader)
+
+        # _progress_hook runs on the download thread
+        def on_progress(message, percent):
+            self._publish_threadsafe(job, status='Downloading', message=message, progress=percent)
+        downloader.progress_callback = on_progress
+
+        # Leave 'Queued' as soon as a worker picks the job up; yt-dlp can take
+        # a while before its first progress hook.
+        def download():
+            self._publish_threadsafe(job, status='Downloading', message="Starting...", progress=0.0)
+            return downloader.download_video(url, format_data, output_path,
+                                             title or analysis['title'] or "Unknown")
+
+        self.jobs[job_id] = job
+        # Submitted here, not in _run_job, so a pause/cancel can always reach the future
+        job.future = self._executor.submit(download)
+        asyncio.ensure_future(self._run_job(job))
+        return 201, job.state
+
+    async def _run_job(self, job):
+        try:
+            status = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            return # Stopped while queued; _stop_job already published
+        except Exception as e:
+            status = 'Error'
+            job.state['message'] = f"Error: {e}"
+        # Queued call_soon_threadsafe updates from the hook run before this point
+        job.publish(status=status or 'Finished')
+
+    async def handle_list_jobs(self, writer, query, body):
+        return 200, [job.state for job in self.jobs.values()]
+
+    async def handle_get_job(self, writer, query, body, job_id):
+        return 200, self._get_job(job_id).state
+
+    def _stop_job(self, job_id, status):
+        job = self._get_job(job_id)
+        if job.done:
+            raise HttpError(409, f"Job {job_id} is already {job.state['status']}")
+        # Flags cover a download that is running or about to start;
+        # a job still waiting for a worker is dropped from the queue outright.
+        if status == 'Paused':
+            job.downloader.pause()
+        else:
+            job.downloader.cancel()
+        if job.future.cancel():
+            job.publish(status=status, message=STOP_MESSAGES[status])
+        return 200, job.state
+
+    async def handle_pause(self, writer, query, body, job_id):
+        return self._stop_job(job_id, 'Paused')
+
+    async def handle_cancel(self, writer, query, body, job_id):
+        return self._stop_job(job_id, 'Cancelled')
+
+    async def handle_history(self, writer, query, body):
+        try:
+            offset = int(query.get('offset', 0))
+            limit = int(query.get('limit', 50))
+        except ValueError:
+            raise HttpError(400, "offset and limit must be integers")
+        if offset < 0 or limit < 1:
+            raise HttpError(400, "offset must be >= 0 and limit >= 1")
+        limit = min(limit, MAX_HISTORY_PAGE)
+        # q takes the same syntax as the history search box; explicit params override it
+        filters = parse_query(query.get('q', ''))
+        for key, param in (('status', 'status'), ('host', 'host'), ('format_label', 'format'),
+                           ('date_from', 'after'), ('date_to', 'before')):
+            if query.get(param):
+                filters[key] = query[param]
+
+        if any(filters.values()):
+            search = partial(self.history_manager.search, **filters, offset=offset, limit=limit)
+            entries = await self._loop.run_in_executor(None, search)
+        else:
+            entries = await self._loop.run_in_executor(None, self.history_manager.get_page, offset, limit)
+        return 200, entries
+
+    async def handle_events(self, writer, query, body, job_id):
+        job = self._get_job(job_id)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        while True:
+            version = job.version
+            writer.write(f"event: progress\ndata: {json.dumps(job.state)}\n\n".encode('utf-8'))
+            await writer.drain()
+            if job.done:
+                return None
+            while job.version == version:
+                try:
+                    await asyncio.wait_for(job.wait_for_change(version), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep-alive comment so proxies and dead clients are noticed
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+
+def serve(host="127.0.0.1", port=8765, low_memory=False):
+    """
+    Runs the API server until interrupted.
+    """
+    async def run():
+        server = await ApiServer(host, port, low_memory=low_memory).start()
+        print(f"API listening on http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -1,9 +1,33 @@
-import yt_dlp
 import threading
 import os
-from .history import HistoryManager
+from .history import HistoryManager, PagedHistoryManager
+
+# yt-dlp builds its extractor registry on import, which is the single biggest
+# cost at startup. It is imported on first use (or by warm_up() in the background).
+_yt_dlp = None
+_yt_dlp_lock = threading.Lock()
+
+def _load_yt_dlp():
+    global _yt_dlp
+    if _yt_dlp is None:
+        with _yt_dlp_lock:
+            if _yt_dlp is None:
+                import yt_dlp
+                _yt_dlp = yt_dlp
+    return _yt_dlp
+
+def warm_up():
+    """
+    Imports yt-dlp on a background thread so the first Analyze click doesn't pay for it.
+    """
+    threading.Thread(target=_load_yt_dlp, daemon=True).start()
 
 class VideoAnalyzer:
+    def __init__(self, low_memory=False):
+        # In low-memory mode raw yt-dlp info dicts (every format plus its HTTP
+        # headers) are dropped as soon as the format list has been parsed.
+        self.low_memory = low_memory
+
     def extract_info(self, url):
         """
         Fetches metadata and available formats for the given URL.
@@ -16,19 +40,25 @@ class VideoAnalyzer:
         }
         
         try:
+            yt_dlp = _load_yt_dlp()
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
             
             is_playlist = info.get('_type') == 'playlist'
             
             if is_playlist:
-                entries = list(info.get('entries', []))
-                count = len(entries)
                 title = info.get('title', 'Unknown Playlist')
+                if self.low_memory:
+                    # Only the first entry's URL is needed; don't hold the rest.
+                    count, first_video_url = self._count_entries(info.get('entries') or [])
+                    info = None
+                else:
+                    entries = list(info.get('entries', []))
+                    count = len(entries)
+                    first_video_url = entries[0]['url'] if count > 0 else None
                 
                 # Analyze the first video to get format options
                 if count > 0:
-                    first_video_url = entries[0]['url']
                     with yt_dlp.YoutubeDL({'quiet': True}) as ydl2:
                         first_video_info = ydl2.extract_info(first_video_url, download=False)
                     
@@ -61,6 +91,18 @@ class VideoAnalyzer:
         except Exception as e:
             return {'error': str(e)}
 
+    def _count_entries(self, entries):
+        """
+        Counts playlist entries while keeping only the first entry's URL.
+        """
+        count = 0
+        first_url = None
+        for entry in entries:
+            if count == 0:
+                first_url = entry['url']
+            count += 1
+        return count, first_url
+
     def _parse_formats(self, info):
         """
         Parses raw format data into user-friendly options.
@@ -116,13 +158,15 @@ class VideoAnalyzer:
         return formats_list
 
 class VideoDownloader:
-    def __init__(self, callback=None):
+    def __init__(self, callback=None, low_memory=False, history_manager=None):
         self.progress_callback = callback
         self.is_cancelled = False
         self.is_paused = False
         self.current_playlist_index = 0
         self.total_playlist_items = 0
-        self.history_manager = HistoryManager()
+        if history_manager is None:
+            history_manager = PagedHistoryManager() if low_memory else HistoryManager()
+        self.history_manager = history_manager
 
     def cancel(self):
         self.is_cancelled = True
@@ -130,13 +174,19 @@ class VideoDownloader:
     def pause(self):
         self.is_paused = True # Effectively cancels current run but logs as paused
 
-    def download_video(self, url, format_data, output_path="downloads", title_hint="Unknown"):
+    def reset(self):
         """
-        Downloads the video or playlist based on user selection.
+        Clears a previous pause/cancel before reusing this downloader.
         """
         self.is_cancelled = False
         self.is_paused = False
-        
+
+    def download_video(self, url, format_data, output_path="downloads", title_hint="Unknown"):
+        """
+        Downloads the video or playlist based on user selection.
+        A pause/cancel requested before this starts is honoured; call reset() to clear it.
+        Returns the final history status: Finished, Paused, Cancelled or Error.
+        """
         if not os.path.exists(output_path):
             os.makedirs(output_path)
             
@@ -176,28 +226,35 @@ class VideoDownloader:
             })
 
         try:
+            if self.is_cancelled or self.is_paused:
+                raise Exception("Stopped before start")
+            yt_dlp = _load_yt_dlp()
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
             
             # If we reached here without exception, success
-            self.history_manager.update_status(history_entry['id'], 'Finished')
+            status = 'Finished'
+            self.history_manager.update_status(history_entry['id'], status)
             if self.progress_callback:
                 self.progress_callback("All downloads finished!", 1.0)
                 
         except Exception as e:
             if self.is_paused:
-                 self.history_manager.update_status(history_entry['id'], 'Paused')
+                 status = 'Paused'
                  msg = "Download Paused."
             elif self.is_cancelled:
-                 self.history_manager.update_status(history_entry['id'], 'Cancelled')
+                 status = 'Cancelled'
                  msg = "Download Cancelled."
             else:
-                 self.history_manager.update_status(history_entry['id'], 'Error')
+                 status = 'Error'
                  msg = f"Error: {str(e)}"
+            self.history_manager.update_status(history_entry['id'], status)
 
             if self.progress_callback:
                 self.progress_callback(msg, 0.0)
 
+        return status
+
     def _progress_hook(self, d):
         # Check Cancellation Status
         if self.is_cancelled:
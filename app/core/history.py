@@ -1,11 +1,69 @@
 import json
 import os
+import sqlite3
+import threading
+from contextlib import closing
 from datetime import datetime
+from uuid import uuid4
+from .search import HistoryIndex, date_bounds, host_of, normalize_host, tokenize
+
+# Columns kept per entry. Shared by both managers so the UI can treat them alike.
+ENTRY_FIELDS = ('id', 'title', 'url', 'format_label', 'status', 'date', 'output_path', 'thumbnail')
+# The SQLite table also stores the URL's host so the host filter can use an index
+_INSERT_SQL = f"INSERT INTO history ({', '.join(ENTRY_FIELDS)}, host) VALUES ({', '.join('?' * (len(ENTRY_FIELDS) + 1))})"
+
+def _new_entry_id():
+    # Concurrent downloads can start within the same second, so no timestamps
+    return uuid4().hex
+
+def _like(text):
+    # Substring pattern with LIKE's own wildcards taken literally
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def _row(entry):
+    return tuple(entry.get(k, '') for k in ENTRY_FIELDS) + (host_of(entry.get('url')),)
 
 class HistoryManager:
     def __init__(self, filepath="history.json"):
         self.filepath = filepath
-        self.history = self._load_history()
+        # Loaded on first access so constructing the manager never touches disk
+        # before the window has painted.
+        self._history = None
+        self._load_lock = threading.Lock()
+        # Downloads run on worker threads and may share one manager.
+        # _write_lock only guards in-memory changes; the file is rewritten
+        # outside it (under _save_lock) so searches never wait on disk I/O.
+        self._write_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._change_count = 0 # Bumped per change so stale snapshots aren't written last
+        self._saved_count = 0
+        self._index = None # Built on first search()
+        # While an index is being built outside _write_lock, changes are queued
+        # here and replayed before it is swapped in.
+        self._index_backlog = None
+        self._index_generation = 0 # Bumped when history is replaced
+        self._build_lock = threading.Lock()
+
+    @property
+    def history(self):
+        if self._history is None:
+            with self._load_lock:
+                if self._history is None:
+                    self._history = self._load_history()
+        return self._history
+
+    @history.setter
+    def history(self, value):
+        self._history = value
+        self._index = None
+        self._index_generation += 1
+
+    def preload(self):
+        """
+        Reads the history file on a background thread.
+        """
+        threading.Thread(target=lambda: self.history, daemon=True).start()
 
     def _load_history(self):
         if not os.path.exists(self.filepath):
@@ -17,11 +75,26 @@ class HistoryManager:
             return []
 
     def save_history(self):
-        try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, indent=4)
-        except Exception as e:
-            print(f"Error saving history: {e}")
+        with self._write_lock:
+            snapshot = self._snapshot_locked()
+        self._write_snapshot(*snapshot)
+
+    def _snapshot_locked(self):
+        # Caller holds _write_lock. A shallow copy is enough: entries are only
+        # ever changed by replacing their status value.
+        self._change_count += 1
+        return self._change_count, list(self.history)
+
+    def _write_snapshot(self, change_count, entries):
+        with self._save_lock:
+            if change_count <= self._saved_count:
+                return # A newer snapshot is already on disk
+            try:
+                with open(self.filepath, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, indent=4)
+                self._saved_count = change_count
+            except Exception as e:
+                print(f"Error saving history: {e}")
 
     def add_entry(self, data):
         """
@@ -29,7 +102,7 @@ class HistoryManager:
         data expected keys: title, url, format_label, status, date, output_path
         """
         entry = {
-            'id': str(int(datetime.now().timestamp())), # Simple ID
+            'id': _new_entry_id(),
             'title': data.get('title', 'Unknown'),
             'url': data.get('url', ''),
             'format_label': data.get('format_label', ''),
@@ -39,21 +112,285 @@ class HistoryManager:
             'thumbnail': data.get('thumbnail', '')
         }
         # Prepend to list (newest first)
-        self.history.insert(0, entry)
-        self.save_history()
+        with self._write_lock:
+            self.history.insert(0, entry)
+            self._index_change('add', entry)
+            snapshot = self._snapshot_locked()
+        self._write_snapshot(*snapshot)
         return entry
 
     def update_status(self, entry_id, new_status):
-        for entry in self.history:
-            if entry['id'] == entry_id:
-                entry['status'] = new_status
-                self.save_history()
-                return True
-        return False
+        with self._write_lock:
+            for entry in self.history:
+                if entry['id'] == entry_id:
+                    old_status, entry['status'] = entry['status'], new_status
+                    self._index_change('status', entry, old_status)
+                    snapshot = self._snapshot_locked()
+                    break
+            else:
+                return False
+        self._write_snapshot(*snapshot)
+        return True
 
     def get_history(self):
         return self.history
 
+    def get_page(self, offset=0, limit=50):
+        """
+        Returns up to `limit` entries (newest first) starting at `offset`.
+        """
+        return self.history[offset:offset + limit]
+
+    def search(self, text='', status=None, host=None, format_label=None,
+               date_from=None, date_to=None, offset=0, limit=50):
+        """
+        Returns entries (newest first) whose title contains every word of `text`
+        as a substring and that pass the given filters. See app.core.search.parse_query.
+        """
+        while True:
+            with self._write_lock:
+                if self._index is not None:
+                    return self._index.search(text, status, host, format_label, date_from, date_to, offset, limit)
+            self.build_index()
+
+    def build_index(self):
+        """
+        Builds the search index ahead of the first query (e.g. from a background thread).
+        The build itself runs without _write_lock so downloads can keep logging.
+        """
+        with self._build_lock:
+            with self._write_lock:
+                if self._index is not None:
+                    return
+                snapshot = list(self.history)
+                generation = self._index_generation
+                self._index_backlog = []
+
+            index = HistoryIndex.build(snapshot)
+
+            with self._write_lock:
+                backlog, self._index_backlog = self._index_backlog, None
+                if generation != self._index_generation:
+                    return # History was cleared meanwhile; the next search rebuilds
+                for change in backlog:
+                    self._apply_change(index, *change)
+                self._index = index
+
+    def _index_change(self, *change):
+        # Caller holds _write_lock
+        if self._index is not None:
+            self._apply_change(self._index, *change)
+        elif self._index_backlog is not None:
+            self._index_backlog.append(change)
+
+    def _apply_change(self, index, kind, entry, old_status=None):
+        if kind == 'add':
+            index.add(entry)
+        else:
+            index.update_status(entry, old_status)
+
+    def clear_history(self):
+        with self._write_lock:
+            self.history = []
+            snapshot = self._snapshot_locked()
+        self._write_snapshot(*snapshot)
+
+class PagedHistoryManager:
+    """
+    Low-memory history store. Entries live in a SQLite file and are only read
+    a page at a time, so memory stays flat no matter how long the history gets.
+    Exposes the same interface as HistoryManager minus the in-memory `history` list.
+    """
+    def __init__(self, filepath="history.db", legacy_path="history.json"):
+        self.filepath = filepath
+        self.legacy_path = legacy_path
+        self._ready = False
+        self._has_fts = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.filepath)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self):
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            is_new = not os.path.exists(self.filepath)
+            with closing(self._connect()) as conn, conn:
+                # WAL lets searches read while a download is being logged
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS history ("
+                    " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " id TEXT, title TEXT, url TEXT, format_label TEXT,"
+                    " status TEXT, date TEXT, output_path TEXT, thumbnail TEXT, host TEXT)"
+                )
+                self._migrate(conn)
+                conn.execute("CREATE INDEX IF NOT EXISTS history_id ON history (id)")
+                conn.execute("CREATE INDEX IF NOT EXISTS history_status ON history (status COLLATE NOCASE)")
+                conn.execute("CREATE INDEX IF NOT EXISTS history_host ON history (host)")
+                conn.execute("CREATE INDEX IF NOT EXISTS history_date ON history (date)")
+                self._has_fts = self._create_fts(conn)
+                if is_new:
+                    self._import_legacy(conn)
+            self._ready = True
+
+    def _migrate(self, conn):
+        # Databases written before search existed have no host column
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(history)")}
+        if 'host' not in columns:
+            conn.execute("ALTER TABLE history ADD COLUMN host TEXT")
+            rows = conn.execute("SELECT seq, url FROM history").fetchall()
+            conn.executemany("UPDATE history SET host = ? WHERE seq = ?",
+                             [(host_of(row['url']), row['seq']) for row in rows])
+
+    def _create_fts(self, conn):
+        """
+        Trigram full-text index over titles (substring matching), kept in sync by triggers.
+        Returns False when this SQLite build lacks FTS5 trigrams; search() then uses LIKE.
+        """
+        existing = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'history_fts'").fetchone()
+        if existing and 'trigram' in existing['sql']:
+            return True
+        # Drop an older word-tokenized index
+        conn.execute("DROP TRIGGER IF EXISTS history_fts_insert")
+        conn.execute("DROP TRIGGER IF EXISTS history_fts_delete")
+        conn.execute("DROP TABLE IF EXISTS history_fts")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE history_fts USING fts5("
+                         "title, content='history', content_rowid='seq', tokenize='trigram')")
+        except sqlite3.OperationalError:
+            return False
+        conn.execute(
+            "CREATE TRIGGER history_fts_insert AFTER INSERT ON history BEGIN"
+            " INSERT INTO history_fts (rowid, title) VALUES (new.seq, new.title); END"
+        )
+        conn.execute(
+            "CREATE TRIGGER history_fts_delete AFTER DELETE ON history BEGIN"
+            " INSERT INTO history_fts (history_fts, rowid, title) VALUES ('delete', old.seq, old.title); END"
+        )
+        conn.execute("INSERT INTO history_fts (history_fts) VALUES ('rebuild')")
+        return True
+
+    def _import_legacy(self, conn):
+        # One-off carry-over of an existing history.json (stored newest first).
+        legacy = HistoryManager(self.legacy_path).get_history()
+        conn.executemany(_INSERT_SQL, [_row(entry) for entry in reversed(legacy)])
+
+    def preload(self):
+        """
+        Creates the database (and imports legacy history) on a background thread.
+        """
+        threading.Thread(target=self._ensure_schema, daemon=True).start()
+
+    def add_entry(self, data):
+        """
+        Adds a new entry to history.
+        data expected keys: title, url, format_label, status, date, output_path
+        """
+        self._ensure_schema()
+        entry = {
+            'id': _new_entry_id(),
+            'title': data.get('title', 'Unknown'),
+            'url': data.get('url', ''),
+            'format_label': data.get('format_label', ''),
+            'status': data.get('status', 'Finished'), # Finished, Cancelled, Paused, Error
+            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'output_path': data.get('output_path', ''),
+            'thumbnail': data.get('thumbnail', '')
+        }
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(_INSERT_SQL, _row(entry))
+        except Exception as e:
+            print(f"Error saving history: {e}")
+        return entry
+
+    def update_status(self, entry_id, new_status):
+        self._ensure_schema()
+        # Like HistoryManager, only the newest entry with this id is updated.
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute(
+                "UPDATE history SET status = ? WHERE seq = "
+                "(SELECT seq FROM history WHERE id = ? ORDER BY seq DESC LIMIT 1)",
+                (new_status, entry_id)
+            )
+            return cur.rowcount > 0
+
+    def get_history(self):
+        """
+        Returns every entry. Defeats the point of this class; prefer get_page().
+        """
+        return self.get_page(0, -1)
+
+    def get_page(self, offset=0, limit=50):
+        """
+        Returns up to `limit` entries (newest first) starting at `offset`.
+        """
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(ENTRY_FIELDS)} FROM history ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, text='', status=None, host=None, format_label=None,
+               date_from=None, date_to=None, offset=0, limit=50):
+        """
+        Returns entries (newest first) whose title contains every word of `text`
+        as a substring and that pass the given filters. See app.core.search.parse_query.
+        """
+        self._ensure_schema()
+        where = []
+        params = []
+        tokens = tokenize(text)
+        # Trigrams need at least three characters; shorter words go through LIKE
+        indexed = [token for token in tokens if self._has_fts and len(token) >= 3]
+        if indexed:
+            where.append("seq IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)")
+            params.append(' '.join(f'"{token}"' for token in indexed))
+        for token in tokens:
+            if token not in indexed:
+                where.append("title LIKE ? ESCAPE '\\'")
+                params.append(_like(token))
+        if status:
+            where.append("status = ? COLLATE NOCASE")
+            params.append(status)
+        if host:
+            where.append("host = ?")
+            params.append(normalize_host(host))
+        if format_label:
+            where.append("format_label LIKE ? ESCAPE '\\'")
+            params.append(_like(format_label))
+        lower, upper = date_bounds(date_from, date_to)
+        if lower:
+            where.append("date >= ?")
+            params.append(lower)
+        if upper:
+            where.append("date <= ?")
+            params.append(upper)
+
+        sql = f"SELECT {', '.join(ENTRY_FIELDS)} FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq DESC LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def build_index(self):
+        """
+        The FTS index is maintained by triggers; this only makes sure it exists.
+        """
+        self._ensure_schema()
+
     def clear_history(self):
-        self.history = []
-        self.save_history()
+        self._ensure_schema()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM history")
@@ -0,0 +1,168 @@
+import heapq
+import re
+from urllib.parse import urlsplit
+
+# Filters that can be typed into the search box alongside free text,
+# e.g. "lofi status:finished host:youtube.com after:2024-01-01"
+FILTER_KEYS = ('status', 'host', 'format', 'after', 'before')
+
+_TOKEN_RE = re.compile(r'\w+')
+_FILTER_RE = re.compile(r'\b(' + '|'.join(FILTER_KEYS) + r'):(\S+)', re.IGNORECASE)
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or '').lower())
+
+def normalize_host(host):
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def host_of(url):
+    """
+    Hostname used for the host filter, without a leading 'www.'.
+    """
+    try:
+        return normalize_host(urlsplit(url or '').hostname)
+    except ValueError:
+        return ''
+
+def parse_query(text):
+    """
+    Splits a search box string into free-text tokens and filter values.
+    Returns the keyword arguments accepted by the history managers' search().
+    """
+    filters = {}
+    def take(m):
+        filters[m.group(1).lower()] = m.group(2)
+        return ' '
+    rest = _FILTER_RE.sub(take, text or '')
+    return {
+        'text': rest.strip(),
+        'status': filters.get('status'),
+        'host': filters.get('host'),
+        'format_label': filters.get('format'),
+        'date_from': filters.get('after'),
+        'date_to': filters.get('before'),
+    }
+
+def date_bounds(date_from, date_to):
+    """
+    Turns day-level bounds into inclusive limits comparable with entry['date']
+    ("YYYY-MM-DD HH:MM:SS"), so a bare "before" date includes that whole day.
+    """
+    lower = date_from or None
+    upper = (date_to + ' 23:59:59' if len(date_to) == 10 else date_to) if date_to else None
+    return lower, upper
+
+class HistoryIndex:
+    """
+    Inverted index over in-memory history entries.
+
+    Entries get an increasing sequence number when indexed (newest = highest),
+    and title words, status, host and format label each map to a set of them.
+    A free-text word matches any title word containing it, so results update
+    sensibly while a word is still being typed. Words that match most of the
+    history (e.g. a single letter) are checked against titles while walking
+    newest first instead, which stops as soon as a page is full.
+    """
+    def __init__(self):
+        self.entries = {}      # seq -> entry
+        self._seq_of = {}      # id(entry) -> seq
+        self._next_seq = 0
+        self.tokens = {}       # title word -> {seq}
+        self.statuses = {}     # lowercased status -> {seq}
+        self.hosts = {}        # host -> {seq}
+        self.formats = {}      # lowercased format label -> {seq}
+
+    @classmethod
+    def build(cls, history):
+        index = cls()
+        # history is newest first; index oldest first so seq follows insertion order
+        for entry in reversed(history):
+            index.add(entry)
+        return index
+
+    def add(self, entry):
+        seq = self._next_seq
+        self._next_seq += 1
+        self.entries[seq] = entry
+        self._seq_of[id(entry)] = seq
+
+        for token in set(tokenize(entry.get('title'))):
+            self.tokens.setdefault(token, set()).add(seq)
+        self.statuses.setdefault((entry.get('status') or '').lower(), set()).add(seq)
+        self.hosts.setdefault(host_of(entry.get('url')), set()).add(seq)
+        self.formats.setdefault((entry.get('format_label') or '').lower(), set()).add(seq)
+
+    def update_status(self, entry, old_status):
+        seq = self._seq_of.get(id(entry))
+        if seq is None:
+            return
+        self.statuses.get((old_status or '').lower(), set()).discard(seq)
+        self.statuses.setdefault((entry.get('status') or '').lower(), set()).add(seq)
+
+    def _substring_matches(self, needle):
+        """
+        Entries with a title word containing `needle`, or None when that would be
+        most of the history and a per-title check is cheaper.
+        """
+        words = [word for word in self.tokens if needle in word]
+        if sum(len(self.tokens[word]) for word in words) > len(self.entries) // 4:
+            return None
+        matches = set()
+        for word in words:
+            matches |= self.tokens[word]
+        return matches
+
+    def search(self, text='', status=None, host=None, format_label=None,
+               date_from=None, date_to=None, offset=0, limit=50):
+        """
+        Returns matching entries, newest first.
+        """
+        candidates = []
+        dense = [] # Words checked per title instead of through postings
+        for token in tokenize(text):
+            matches = self._substring_matches(token)
+            if matches is None:
+                dense.append(token)
+            else:
+                candidates.append(matches)
+        if status:
+            candidates.append(self.statuses.get(status.lower(), set()))
+        if host:
+            candidates.append(self.hosts.get(normalize_host(host), set()))
+        if format_label:
+            # Few distinct labels, so a substring scan over them is cheap
+            needle = format_label.lower()
+            matched = set()
+            for label, postings in self.formats.items():
+                if needle in label:
+                    matched |= postings
+            candidates.append(matched)
+
+        lower, upper = date_bounds(date_from, date_to)
+        def keep(seq):
+            entry = self.entries[seq]
+            if lower and entry['date'] < lower or upper and entry['date'] > upper:
+                return False
+            if dense:
+                title = (entry.get('title') or '').lower()
+                return all(token in title for token in dense)
+            return True
+
+        if candidates:
+            # Intersect smallest first
+            candidates.sort(key=len)
+            seqs = candidates[0].intersection(*candidates[1:])
+            if lower or upper or dense:
+                seqs = [s for s in seqs if keep(s)]
+            top = sorted(seqs, reverse=True) if limit is None else heapq.nlargest(offset + limit, seqs)
+        else:
+            # Nothing selective: walk newest first and stop once the page is full
+            top = []
+            wanted = None if limit is None else offset + limit
+            for seq in range(self._next_seq - 1, -1, -1):
+                if keep(seq):
+                    top.append(seq)
+                    if wanted is not None and len(top) >= wanted:
+                        break
+        return [self.entries[s] for s in top[offset:]]
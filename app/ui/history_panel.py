@@ -1,17 +1,28 @@
 import customtkinter as ctk
+import threading
 from app.ui.theme import COLORS, FONTS
-from app.core.history import HistoryManager
+from app.core.history import HistoryManager, PagedHistoryManager
+from app.core.search import parse_query
+
+PAGE_SIZE = 50 # Entries rendered per "Load more" click
+SEARCH_DELAY_MS = 150 # Debounce while typing
 
 class HistoryPanel(ctk.CTkFrame):
-    def __init__(self, parent, resume_callback=None, back_callback=None):
+    def __init__(self, parent, resume_callback=None, back_callback=None, low_memory=False, history_manager=None):
         super().__init__(parent, fg_color=COLORS["bg"])
         
         self.resume_callback = resume_callback
         self.back_callback = back_callback
-        self.history_manager = HistoryManager()
+        if history_manager is None:
+            history_manager = PagedHistoryManager() if low_memory else HistoryManager()
+        self.history_manager = history_manager
+        self.loaded_count = 0
+        self.load_more_btn = None
+        self.search_job = None
+        self.request_id = 0 # Results from superseded requests are dropped
         
         self._setup_ui()
-        self.load_history()
+        # Entries are rendered on first open_history(), not at startup.
 
     def _setup_ui(self):
         # Header
@@ -33,24 +44,82 @@ class HistoryPanel(ctk.CTkFrame):
                                     command=self.load_history)
         refresh_btn.pack(side="right")
 
+        self.search_entry = ctk.CTkEntry(self.header, placeholder_text="Search... (status:error host:youtube.com format:720p after:2024-01-01)",
+                                         font=FONTS["small"], height=30, fg_color=COLORS["input"], border_width=0)
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=(20, 10))
+        self.search_entry.bind("<KeyRelease>", self._on_search_changed)
+
         # Scrollable List
         self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
         self.scroll_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
     def load_history(self):
-        # Clear existing
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-            
-        history = self.history_manager.get_history()
-        
-        if not history:
-            lbl = ctk.CTkLabel(self.scroll_frame, text="No history yet.", text_color=COLORS["subtext"])
-            lbl.pack(pady=20)
-            return
+        # Warm the search index so the first keystroke doesn't pay for it
+        threading.Thread(target=self.history_manager.build_index, daemon=True).start()
+        self._request_page(0)
+
+    def load_more(self):
+        self._request_page(self.loaded_count)
+
+    def _on_search_changed(self, event=None):
+        if self.search_job:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self.search_job = None
+        self._request_page(0)
+
+    def _request_page(self, offset):
+        self.request_id += 1
+        query = self.search_entry.get().strip()
+        threading.Thread(target=self._fetch_thread, args=(self.request_id, query, offset), daemon=True).start()
 
-        for entry in history:
+    def _fetch_thread(self, request_id, query, offset):
+        try:
+            if query:
+                entries = self.history_manager.search(**parse_query(query), offset=offset, limit=PAGE_SIZE)
+            else:
+                entries = self.history_manager.get_page(offset, PAGE_SIZE)
+            if self.winfo_exists():
+                self.after(0, lambda: self._on_page_loaded(request_id, query, offset, entries))
+        except Exception as e:
+            print(f"History Error: {e}")
+
+    def _on_page_loaded(self, request_id, query, offset, entries):
+        if request_id != self.request_id:
+            return # The user kept typing
+
+        if offset == 0:
+            # Clear existing
+            for widget in self.scroll_frame.winfo_children():
+                widget.destroy()
+            self.loaded_count = 0
+            self.load_more_btn = None
+
+            if not entries:
+                text = "No matching entries." if query else "No history yet."
+                lbl = ctk.CTkLabel(self.scroll_frame, text=text, text_color=COLORS["subtext"])
+                lbl.pack(pady=20)
+                return
+
+        self._append_page(entries)
+
+    def _append_page(self, entries):
+        if self.load_more_btn:
+            self.load_more_btn.destroy()
+            self.load_more_btn = None
+
+        for entry in entries:
             self._create_history_item(entry)
+        self.loaded_count += len(entries)
+
+        # A full page means there may be more on disk
+        if len(entries) == PAGE_SIZE:
+            self.load_more_btn = ctk.CTkButton(self.scroll_frame, text="Load more", width=100, height=28,
+                                               fg_color=COLORS["input"], hover_color=COLORS["card"],
+                                               font=FONTS["small"], command=self.load_more)
+            self.load_more_btn.pack(pady=10)
 
     def _create_history_item(self, entry):
         card = ctk.CTkFrame(self.scroll_frame, fg_color=COLORS["card"], corner_radius=10)
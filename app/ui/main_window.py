@@ -1,14 +1,14 @@
 import customtkinter as ctk
 import threading
-from PIL import Image
-import requests
 from io import BytesIO
-from app.core.downloader import VideoAnalyzer, VideoDownloader
+from app.core.downloader import VideoAnalyzer, VideoDownloader, warm_up
 from app.ui.history_panel import HistoryPanel
 from app.ui.theme import COLORS, FONTS
 
+WARM_UP_DELAY_MS = 100 # Head start for the first paint before background imports
+
 class MainWindow(ctk.CTk):
-    def __init__(self):
+    def __init__(self, low_memory=False):
         super().__init__()
 
         self.title("Any Video Downloader")
@@ -16,8 +16,8 @@ class MainWindow(ctk.CTk):
         self.configure(fg_color=COLORS["bg"])
         
         # Core Components
-        self.analyzer = VideoAnalyzer()
-        self.downloader = VideoDownloader(callback=self.update_progress)
+        self.analyzer = VideoAnalyzer(low_memory=low_memory)
+        self.downloader = VideoDownloader(callback=self.update_progress, low_memory=low_memory)
         self.current_formats = []
         
         # UI Setup
@@ -26,9 +26,26 @@ class MainWindow(ctk.CTk):
         # History Panel (Hidden by default)
         self.history_panel = HistoryPanel(self, 
                                           resume_callback=self.resume_download_from_history,
-                                          back_callback=self.show_downloader)
+                                          back_callback=self.show_downloader,
+                                          history_manager=self.downloader.history_manager)
         # We don't pack/place it yet. We will swap it in when needed.
 
+        # Heavy imports and history I/O wait until the window is on screen.
+        # An after_idle() here would run inside the first update(), before the
+        # widgets have drawn, so start the clock from the first <Map> instead.
+        self._warm_up_scheduled = False
+        self.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, event):
+        if self._warm_up_scheduled or event.widget is not self:
+            return
+        self._warm_up_scheduled = True
+        self.after(WARM_UP_DELAY_MS, self._warm_up)
+
+    def _warm_up(self):
+        warm_up()
+        self.downloader.history_manager.preload() # Shared with the history panel
+
     def _setup_layout(self):
         # 1. Main Container (Centers content)
         self.main_container = ctk.CTkFrame(self, fg_color="transparent")
@@ -128,6 +145,8 @@ class MainWindow(ctk.CTk):
 
         # 1. Thumbnail
         try:
+            import requests
+            from PIL import Image
             response = requests.get(data['thumbnail'])
             img_data = BytesIO(response.content)
             pil_img = Image.open(img_data)
@@ -240,6 +259,7 @@ class MainWindow(ctk.CTk):
         except:
             title_hint = "Unknown Video"
 
+        self.downloader.reset()
         threading.Thread(target=self._download_thread, args=(url, format_data, title_hint), daemon=True).start()
 
     def cancel_download(self):
@@ -0,0 +1,117 @@
+"""
+API fan-out benchmark: one download job streamed to hundreds of SSE subscribers.
+Fully offline; the downloader feeds synthetic yt-dlp progress dicts through the
+real VideoDownloader._progress_hook.
+
+Usage: python benchmarks/api_subscribers.py [--subscribers N] [--updates N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.api.server import ApiServer
+from app.core.downloader import VideoDownloader
+from app.core.history import HistoryManager
+
+class FakeAnalyzer:
+    def extract_info(self, url):
+        return {'title': 'Offline', 'webpage_url': url, 'formats': [{'id': 'video-720', 'label': '720p (MP4)'}]}
+
+def fake_downloader_factory(updates, interval, gate):
+    class FakeDownloader(VideoDownloader):
+        def download_video(self, url, format_data, output_path="downloads", title_hint="Unknown"):
+            entry = self.history_manager.add_entry({'title': title_hint, 'url': url,
+                                                    'format_label': format_data['label'], 'status': 'Downloading'})
+            gate.wait()
+            total = 100 * 1024 * 1024
+            for i in range(1, updates + 1):
+                self._progress_hook({'status': 'downloading', 'total_bytes': total,
+                                     'downloaded_bytes': total * i // updates, 'speed': 5 * 1024 * 1024, 'eta': updates - i})
+                time.sleep(interval)
+            self._progress_hook({'status': 'finished'})
+            self.history_manager.update_status(entry['id'], 'Finished')
+            self.progress_callback("All downloads finished!", 1.0)
+            return 'Finished'
+    return FakeDownloader
+
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+async def subscribe(port, job_id, ready):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /jobs/{job_id}/events HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    events = 0
+    last = None
+    first = True
+    while True:
+        chunk = await reader.readuntil(b"\n\n")
+        if first:
+            ready()
+            first = False
+        if chunk.startswith(b"event: progress"):
+            events += 1
+            last = json.loads(chunk.split(b"data: ", 1)[1])
+            if last['status'] in ('Finished', 'Paused', 'Cancelled', 'Error'):
+                break
+    writer.close()
+    return events, last
+
+async def run(args):
+    history = HistoryManager(os.path.join(tempfile.mkdtemp(prefix="avd-apibench-"), "history.json"))
+    gate = threading.Event()
+    server = await ApiServer(port=0, analyzer=FakeAnalyzer(), history_manager=history,
+                             downloader_factory=fake_downloader_factory(args.updates, args.interval, gate)).start()
+
+    status, analysis = await request(server.port, "POST", "/analyze", {'url': 'https://example.com/v'})
+    assert status == 200, analysis
+
+    # Hold the download until every subscriber is attached
+    status, job = await request(server.port, "POST", "/jobs", {'url': 'https://example.com/v', 'format': 'video-720'})
+    assert status == 201, job
+    remaining = [args.subscribers]
+    def ready():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            gate.set()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(subscribe(server.port, job['id'], ready) for _ in range(args.subscribers)))
+    elapsed = time.perf_counter() - start
+
+    status, entries = await request(server.port, "GET", "/history?limit=5")
+    await server.stop()
+
+    counts = [events for events, _ in results]
+    finished = sum(1 for _, last in results if last['status'] == 'Finished')
+    print(f"subscribers: {args.subscribers}  updates: {args.updates}  wall: {elapsed:.2f}s")
+    print(f"events per subscriber: min {min(counts)}  max {max(counts)}  finished: {finished}/{args.subscribers}")
+    print(f"history entries: {len(entries)} (latest status: {entries[0]['status']})")
+    return 0 if finished == args.subscribers else 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between progress updates")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
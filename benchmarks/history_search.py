@@ -0,0 +1,130 @@
+"""
+History search latency on a large synthetic history (default 100k entries),
+for both the in-memory inverted index and the SQLite FTS backend, idle and
+while downloads are being logged (each log rewrites the history file).
+
+Usage: python benchmarks/history_search.py [--entries N] [--target MS] [--busy-seconds S]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.history import HistoryManager, PagedHistoryManager
+from app.core.search import parse_query
+
+STATUSES = ['Finished', 'Finished', 'Finished', 'Error', 'Cancelled', 'Paused']
+HOSTS = ['https://www.youtube.com/watch?v=', 'https://vimeo.com/', 'https://soundcloud.com/a/', 'https://example.org/media/']
+FORMATS = ['1080p (MP4)', '720p (MP4)', '480p (MP4)', 'MP3 High (320kbps)', 'MP3 Medium (192kbps)']
+
+# What a user types, keystroke by keystroke, plus filter-only queries
+QUERIES = ['l', 'lo', 'lof', 'lofi', 'lofi b', 'lofi be', 'lofi beats',
+           'm', 'mu', 'mus', 'musi', 'music live', 'zzzz', 'ofi', 'eat', 'usi liv',
+           'status:error', 'host:vimeo.com', 'format:720p', 'after:2025-06-01',
+           'lofi status:finished host:youtube.com', 'live format:mp3 after:2025-01-01 before:2025-03-31']
+
+def make_words(rng, count):
+    syllables = ['ka', 'lo', 'fi', 'mu', 'si', 'be', 'at', 'ra', 'ne', 'to', 'vi', 'de', 'o', 'li', 've', 'po', 'ds']
+    words = {'lofi', 'beats', 'music', 'live', 'mix', 'tutorial', 'podcast', 'episode'}
+    while len(words) < count:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def make_history(n, seed=1):
+    rng = random.Random(seed)
+    words = make_words(rng, 5000)
+    start = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))
+    history = []
+    for i in range(n):
+        history.append({
+            'id': str(i),
+            'title': ' '.join(rng.choice(words) for _ in range(rng.randint(3, 8))).title(),
+            'url': rng.choice(HOSTS) + str(i),
+            'format_label': rng.choice(FORMATS),
+            'status': rng.choice(STATUSES),
+            'date': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + i * 600)),
+            'output_path': 'downloads',
+            'thumbnail': '',
+        })
+    history.reverse() # Newest first, as HistoryManager stores it
+    return history
+
+def measure(manager):
+    samples = []
+    for query in QUERIES:
+        t = time.perf_counter()
+        manager.search(**parse_query(query), limit=50)
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples
+
+def measure_while_logging(manager, seconds):
+    """
+    Runs the queries back to back while another thread keeps logging downloads.
+    """
+    stop = threading.Event()
+    saves = [0]
+    def log_downloads():
+        while not stop.is_set():
+            entry = manager.add_entry({'title': 'Busy Download', 'url': 'https://vimeo.com/1', 'status': 'Downloading'})
+            manager.update_status(entry['id'], 'Finished')
+            saves[0] += 2
+    writer = threading.Thread(target=log_downloads)
+    writer.start()
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        samples += measure(manager)
+    stop.set()
+    writer.join()
+    return samples, saves[0]
+
+def report(name, build_ms, samples, target):
+    p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+    print(f"{name:8s} build {build_ms:8.0f} ms | query median {statistics.median(samples):6.1f} ms"
+          f"  p95 {p95:6.1f} ms  max {max(samples):6.1f} ms")
+    return max(samples) <= target
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--target", type=float, default=100.0, help="Slowest query must stay below this (ms)")
+    parser.add_argument("--busy-seconds", type=float, default=5.0, help="How long to search while logging downloads")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="avd-searchbench-")
+    json_path = os.path.join(tmp, "history.json")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(make_history(args.entries), f)
+
+    ok = True
+
+    memory = HistoryManager(json_path)
+    t = time.perf_counter()
+    memory.search(limit=1) # Loads the file and builds the index
+    build_ms = (time.perf_counter() - t) * 1000
+    ok &= report("memory", build_ms, measure(memory), args.target)
+    samples, saves = measure_while_logging(memory, args.busy_seconds)
+    ok &= report("  +busy", build_ms, samples, args.target)
+    print(f"{'':8s} ({saves} history writes during {len(samples)} queries)")
+
+    paged = PagedHistoryManager(os.path.join(tmp, "history.db"), legacy_path=json_path)
+    t = time.perf_counter()
+    paged.search(limit=1) # Imports history.json and builds the FTS index
+    build_ms = (time.perf_counter() - t) * 1000
+    ok &= report("sqlite", build_ms, measure(paged), args.target)
+    samples, saves = measure_while_logging(paged, args.busy_seconds)
+    ok &= report("  +busy", build_ms, samples, args.target)
+    print(f"{'':8s} ({saves} history writes during {len(samples)} queries)")
+
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
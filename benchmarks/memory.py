@@ -0,0 +1,140 @@
+"""
+Steady-state memory benchmark: a session of hundreds of playlist analyses,
+downloads logged to history and history pages viewed, started on top of an
+existing large history. Each mode runs in a fresh process; the report shows
+the RSS each settles at and how much it grows afterwards. Fully offline;
+yt-dlp is replaced by a fake that returns realistically heavy info dicts.
+
+Usage: python benchmarks/memory.py [--history N] [--iterations N] [--max-growth MB]
+
+Low-memory mode's gain is the history: the default HistoryManager holds every
+entry in memory, PagedHistoryManager reads one page at a time. Neither mode keeps
+raw yt-dlp info dicts after extract_info() returns; low-memory mode only lowers
+the peak during a playlist analysis.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core import downloader
+from app.core.downloader import VideoAnalyzer, VideoDownloader
+from app.core.history import PagedHistoryManager
+from history_search import make_history
+
+PLAYLIST_SIZE = 500
+FORMATS_PER_VIDEO = 60
+
+class FakeYoutubeDL:
+    """
+    Stands in for yt_dlp.YoutubeDL. Playlist URLs yield flat entries, anything
+    else yields a video with every format carrying its own HTTP headers.
+    """
+    def __init__(self, opts=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        if 'list=' in url:
+            return {
+                '_type': 'playlist',
+                'title': f"Playlist {url}",
+                'entries': [{'url': f"{url}&v={i}", 'title': f"Video {i}" * 4} for i in range(PLAYLIST_SIZE)],
+            }
+        return {
+            'title': f"Video {url}",
+            'thumbnail': f"{url}/thumb.jpg",
+            'duration': 600,
+            'webpage_url': url,
+            'formats': [{
+                'format_id': str(i),
+                'height': 144 + (i % 12) * 90,
+                'url': f"{url}/stream/{i}?" + "sig=" + "x" * 400,
+                'http_headers': {'User-Agent': 'Mozilla/5.0 ' * 10, 'Accept': '*/*', 'Cookie': 'c' * 300},
+            } for i in range(FORMATS_PER_VIDEO)],
+        }
+
+class FakeYtDlp:
+    YoutubeDL = FakeYoutubeDL
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        # Peak rather than current RSS, but still shows unbounded growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def run_session(low_memory, iterations, warmup):
+    """
+    Child process body. Runs in a copy of the seeded history directory.
+    """
+    downloader._yt_dlp = FakeYtDlp
+
+    analyzer = VideoAnalyzer(low_memory=low_memory)
+    history = VideoDownloader(low_memory=low_memory).history_manager
+    kept = [] # What a UI session holds on to: the latest analysis result and history page
+
+    samples = {}
+    for i in range(1, iterations + 1):
+        data = analyzer.extract_info(f"https://example.com/playlist?list={i}")
+        entry = history.add_entry({'title': data['title'], 'url': data['webpage_url'],
+                                   'format_label': data['formats'][0]['label'], 'status': 'Downloading'})
+        history.update_status(entry['id'], 'Finished')
+        kept = [data, history.get_page(0, 50)]
+
+        if i == warmup or i % 50 == 0 or i == iterations:
+            samples[i] = rss_mb()
+    print(json.dumps(samples))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=10_000, help="Entries already in history when the session starts")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--max-growth", type=float, default=2.0, help="Allowed low-memory RSS growth after warm-up (MB)")
+    parser.add_argument("--child", choices=["default", "low-memory"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_session(args.child == "low-memory", args.iterations, args.warmup)
+        return 0
+
+    # Seed both stores once; the legacy import is a one-off, not part of the session
+    seed = tempfile.mkdtemp(prefix="avd-membench-")
+    with open(os.path.join(seed, "history.json"), 'w', encoding='utf-8') as f:
+        json.dump(make_history(args.history), f)
+    PagedHistoryManager(os.path.join(seed, "history.db"), os.path.join(seed, "history.json")).build_index()
+
+    results = {}
+    for mode in ("default", "low-memory"):
+        workdir = tempfile.mkdtemp(prefix=f"avd-membench-{mode}-")
+        shutil.copytree(seed, workdir, dirs_exist_ok=True)
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode,
+                              "--iterations", str(args.iterations), "--warmup", str(args.warmup)],
+                             cwd=workdir, capture_output=True, text=True, check=True)
+        samples = {int(k): v for k, v in json.loads(out.stdout).items()}
+        settled, final = samples[args.warmup], samples[args.iterations]
+        results[mode] = (settled, final - settled)
+        trace = "  ".join(f"{i}:{mb:.0f}" for i, mb in sorted(samples.items()))
+        print(f"{mode:10s} settled {settled:6.1f} MB  growth {final - settled:+5.1f} MB  | {trace}")
+
+    (default_rss, _), (low_rss, low_growth) = results["default"], results["low-memory"]
+    print(f"low-memory saves {default_rss - low_rss:.1f} MB with {args.history} entries in history")
+    return 0 if low_growth <= args.max_growth and low_rss < default_rss else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
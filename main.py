@@ -1,10 +1,26 @@
-import customtkinter as ctk
-from app.ui.main_window import MainWindow
+import argparse
 
 if __name__ == "__main__":
-    # Set the theme
-    ctk.set_appearance_mode("Dark")  # Modes: "System" (standard), "Dark", "Light"
-    ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
+    parser = argparse.ArgumentParser(description="Any Video Downloader")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Keep only compact records in memory and page history from disk (for long sessions)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the local HTTP/JSON API instead of the window")
+    parser.add_argument("--host", default="127.0.0.1", help="API bind address (with --serve)")
+    parser.add_argument("--port", type=int, default=8765, help="API port (with --serve)")
+    args = parser.parse_args()
 
-    app = MainWindow()
-    app.mainloop()
+    if args.serve:
+        # Headless: never touches Tk
+        from app.api.server import serve
+        serve(args.host, args.port, low_memory=args.low_memory)
+    else:
+        import customtkinter as ctk
+        from app.ui.main_window import MainWindow
+
+        # Set the theme
+        ctk.set_appearance_mode("Dark")  # Modes: "System" (standard), "Dark", "Light"
+        ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
+
+        app = MainWindow(low_memory=args.low_memory)
+        app.mainloop()